@@ -10,15 +10,18 @@ This example demonstrates all the generative UI capabilities:
 - Knowledge base with vector search
 """
 
+import os
+import sys
+from types import MappingProxyType
+
 from agno.agent import Agent
 from agno.tools import tool
 from agno.models.openai import OpenAIChat
 from agno.models.anthropic import Claude
-from agno.knowledge.knowledge import Knowledge
-from agno.knowledge.embedder.openai import OpenAIEmbedder
-from agno.vectordb.lancedb import LanceDb, SearchType
 from typing import TypedDict
+import orjson
 from agno.tools.reasoning import ReasoningTools
+from agno.utils.http import get_default_async_client
 
 
 # ============================================================================
@@ -57,12 +60,142 @@ class DashboardMetrics(TypedDict):
     customerTrend: str
     projectStatus: str
 
+# ============================================================================
+# STATIC TOOL PAYLOADS
+# ============================================================================
+
+def _freeze(payload) -> str:
+    """Serialize a static tool payload once, at import.
+
+    Agno stringifies tool results with ``str()`` before handing them to the
+    model, so returning a pre-encoded JSON string means each call is a dict
+    lookup: no literal rebuilding and no per-call serialization. Strings are
+    immutable, so history snapshots (which deep-copy tool results) alias the
+    same object instead of copying it.
+    """
+    return orjson.dumps(payload).decode()
+
+_REVENUE_PAYLOADS: MappingProxyType[str, str] = MappingProxyType({
+    "quarterly": _freeze([
+        {"month": "Q1", "revenue": 18000, "expenses": 10500},
+        {"month": "Q2", "revenue": 21000, "expenses": 12000},
+        {"month": "Q3", "revenue": 24000, "expenses": 13500},
+        {"month": "Q4", "revenue": 27000, "expenses": 15000},
+    ]),
+    "monthly": _freeze([
+        {"month": "Jan", "revenue": 5000, "expenses": 3000},
+        {"month": "Feb", "revenue": 6000, "expenses": 3500},
+        {"month": "Mar", "revenue": 7000, "expenses": 4000},
+        {"month": "Apr", "revenue": 7500, "expenses": 4200},
+        {"month": "May", "revenue": 8000, "expenses": 4500},
+        {"month": "Jun", "revenue": 8500, "expenses": 4800},
+    ]),
+})
+
+_RENTAL_CARS_PAYLOAD = _freeze([
+    {
+        "id": "car-1",
+        "name": "Tesla Model 3",
+        "description": "Electric sedan with autopilot and premium interior",
+        "price_per_day": 120,
+        "type": "Electric",
+        "seats": 5,
+        "image_url": "https://images.unsplash.com/photo-1560958089-b8a1929cea89?w=400",
+        "available": True,
+    },
+    {
+        "id": "car-2",
+        "name": "BMW X5",
+        "description": "Luxury SUV with advanced safety features",
+        "price_per_day": 150,
+        "type": "SUV",
+        "seats": 7,
+        "image_url": "https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400",
+        "available": True,
+    },
+    {
+        "id": "car-3",
+        "name": "Honda Civic",
+        "description": "Reliable and fuel-efficient compact car",
+        "price_per_day": 45,
+        "type": "Compact",
+        "seats": 5,
+        "image_url": "https://images.unsplash.com/photo-1590362891991-f776e747a588?w=400",
+        "available": True,
+    },
+    {
+        "id": "car-4",
+        "name": "Ford Mustang",
+        "description": "Iconic sports car with powerful performance",
+        "price_per_day": 95,
+        "type": "Sports",
+        "seats": 4,
+        "image_url": "https://images.unsplash.com/photo-1584345604476-8ec5f8f2c8c2?w=400",
+        "available": False,
+    },
+])
+
+_LAPTOP_COMPARISON_PAYLOAD = _freeze([
+    {
+        "name": "MacBook Pro 16\"",
+        "price": 2499,
+        "cpu": "M3 Max",
+        "ram": "32GB",
+        "storage": "1TB SSD",
+        "display": "16.2\" Retina",
+        "rating": 4.8,
+    },
+    {
+        "name": "Dell XPS 15",
+        "price": 1899,
+        "cpu": "Intel i9",
+        "ram": "32GB",
+        "storage": "1TB SSD",
+        "display": "15.6\" OLED",
+        "rating": 4.6,
+    },
+    {
+        "name": "Lenovo ThinkPad X1",
+        "price": 1699,
+        "cpu": "Intel i7",
+        "ram": "16GB",
+        "storage": "512GB SSD",
+        "display": "14\" IPS",
+        "rating": 4.5,
+    },
+    {
+        "name": "ASUS ROG Zephyrus",
+        "price": 2199,
+        "cpu": "AMD Ryzen 9",
+        "ram": "32GB",
+        "storage": "1TB SSD",
+        "display": "15.6\" QHD",
+        "rating": 4.7,
+    },
+])
+
+_DASHBOARD_METRICS_PAYLOAD = _freeze({
+    "totalSales": 125000,
+    "newCustomers": 234,
+    "activeProjects": 12,
+    "salesTrend": "+12.5%",
+    "customerTrend": "+8.3%",
+    "projectStatus": "On Track",
+})
+
+_MARKET_SHARE_PAYLOAD = _freeze([
+    {"company": "Company A", "share": 35},
+    {"company": "Company B", "share": 28},
+    {"company": "Company C", "share": 22},
+    {"company": "Company D", "share": 15},
+])
+
 # ============================================================================
 # BACKEND DATA FETCHING TOOLS (execute on backend)
 # ============================================================================
 
 @tool
-def get_revenue_data(period: str = "monthly") -> list[RevenueData]:
+def get_revenue_data(period: str = "monthly") -> str:
     """
     Fetch revenue data from the database.
 
@@ -70,27 +203,12 @@ def get_revenue_data(period: str = "monthly") -> list[RevenueData]:
         period: The time period ("monthly", "quarterly", "yearly")
 
     Returns:
-        List of revenue data with month, revenue, and expenses
+        JSON list of revenue data with month, revenue, and expenses
     """
-    if period == "quarterly":
-        return [
-            {"month": "Q1", "revenue": 18000, "expenses": 10500},
-            {"month": "Q2", "revenue": 21000, "expenses": 12000},
-            {"month": "Q3", "revenue": 24000, "expenses": 13500},
-            {"month": "Q4", "revenue": 27000, "expenses": 15000},
-        ]
-
-    return [
-        {"month": "Jan", "revenue": 5000, "expenses": 3000},
-        {"month": "Feb", "revenue": 6000, "expenses": 3500},
-        {"month": "Mar", "revenue": 7000, "expenses": 4000},
-        {"month": "Apr", "revenue": 7500, "expenses": 4200},
-        {"month": "May", "revenue": 8000, "expenses": 4500},
-        {"month": "Jun", "revenue": 8500, "expenses": 4800},
-    ]
+    return _REVENUE_PAYLOADS.get(period, _REVENUE_PAYLOADS["monthly"])
 
 @tool
-def get_rental_cars(location: str = "San Francisco") -> list[CarData]:
+def get_rental_cars(location: str = "San Francisco") -> str:
     """
     Fetch available rental cars from the database.
 
@@ -98,53 +216,12 @@ def get_rental_cars(location: str = "San Francisco") -> list[CarData]:
         location: City or location for car search
 
     Returns:
-        List of available rental cars with details
+        JSON list of available rental cars with details
     """
-    return [
-        {
-            "id": "car-1",
-            "name": "Tesla Model 3",
-            "description": "Electric sedan with autopilot and premium interior",
-            "price_per_day": 120,
-            "type": "Electric",
-            "seats": 5,
-            "image_url": "https://images.unsplash.com/photo-1560958089-b8a1929cea89?w=400",
-            "available": True,
-        },
-        {
-            "id": "car-2",
-            "name": "BMW X5",
-            "description": "Luxury SUV with advanced safety features",
-            "price_per_day": 150,
-            "type": "SUV",
-            "seats": 7,
-            "image_url": "https://images.unsplash.com/photo-1555215695-3004980ad54e?w=400",
-            "available": True,
-        },
-        {
-            "id": "car-3",
-            "name": "Honda Civic",
-            "description": "Reliable and fuel-efficient compact car",
-            "price_per_day": 45,
-            "type": "Compact",
-            "seats": 5,
-            "image_url": "https://images.unsplash.com/photo-1590362891991-f776e747a588?w=400",
-            "available": True,
-        },
-        {
-            "id": "car-4",
-            "name": "Ford Mustang",
-            "description": "Iconic sports car with powerful performance",
-            "price_per_day": 95,
-            "type": "Sports",
-            "seats": 4,
-            "image_url": "https://images.unsplash.com/photo-1584345604476-8ec5f8f2c8c2?w=400",
-            "available": False,
-        },
-    ]
+    return _RENTAL_CARS_PAYLOAD
 
 @tool
-def get_laptop_comparison(category: str = "laptops") -> list[ProductData]:
+def get_laptop_comparison(category: str = "laptops") -> str:
     """
     Fetch product comparison data from the database.
 
@@ -152,49 +229,12 @@ def get_laptop_comparison(category: str = "laptops") -> list[ProductData]:
         category: Product category to compare
 
     Returns:
-        List of products with specifications
+        JSON list of products with specifications
     """
-    return [
-        {
-            "name": "MacBook Pro 16\"",
-            "price": 2499,
-            "cpu": "M3 Max",
-            "ram": "32GB",
-            "storage": "1TB SSD",
-            "display": "16.2\" Retina",
-            "rating": 4.8,
-        },
-        {
-            "name": "Dell XPS 15",
-            "price": 1899,
-            "cpu": "Intel i9",
-            "ram": "32GB",
-            "storage": "1TB SSD",
-            "display": "15.6\" OLED",
-            "rating": 4.6,
-        },
-        {
-            "name": "Lenovo ThinkPad X1",
-            "price": 1699,
-            "cpu": "Intel i7",
-            "ram": "16GB",
-            "storage": "512GB SSD",
-            "display": "14\" IPS",
-            "rating": 4.5,
-        },
-        {
-            "name": "ASUS ROG Zephyrus",
-            "price": 2199,
-            "cpu": "AMD Ryzen 9",
-            "ram": "32GB",
-            "storage": "1TB SSD",
-            "display": "15.6\" QHD",
-            "rating": 4.7,
-        },
-    ]
+    return _LAPTOP_COMPARISON_PAYLOAD
 
 @tool
-def get_dashboard_metrics(userId: str = "user123") -> DashboardMetrics:
+def get_dashboard_metrics(userId: str = "user123") -> str:
     """
     Fetch dashboard metrics from analytics database.
 
@@ -202,31 +242,19 @@ def get_dashboard_metrics(userId: str = "user123") -> DashboardMetrics:
         userId: User ID for personalized metrics
 
     Returns:
-        Dictionary with dashboard metrics
+        JSON object with dashboard metrics
     """
-    return {
-        "totalSales": 125000,
-        "newCustomers": 234,
-        "activeProjects": 12,
-        "salesTrend": "+12.5%",
-        "customerTrend": "+8.3%",
-        "projectStatus": "On Track",
-    }
+    return _DASHBOARD_METRICS_PAYLOAD
 
 @tool
-def get_market_share_data() -> list[dict]:
+def get_market_share_data() -> str:
     """
     Fetch market share data for visualization.
 
     Returns:
-        List of market share data by company
+        JSON list of market share data by company
     """
-    return [
-        {"company": "Company A", "share": 35},
-        {"company": "Company B", "share": 28},
-        {"company": "Company C", "share": 22},
-        {"company": "Company D", "share": 15},
-    ]
+    return _MARKET_SHARE_PAYLOAD
 
 # ============================================================================
 # FRONTEND RENDERING TOOLS (execute on frontend)
@@ -314,25 +342,90 @@ def ask_user_question(question: str):
     """
     pass
 
+# ============================================================================
+# TOOL REGISTRY
+# ============================================================================
+
+_TOOLS = (
+    # Backend data fetching tools
+    get_revenue_data,
+    get_rental_cars,
+    get_laptop_comparison,
+    get_dashboard_metrics,
+    get_market_share_data,
+    # Frontend rendering tools
+    render_revenue_chart,
+    render_rental_cars,
+    render_product_comparison,
+    render_dashboard,
+    render_visualization,
+    show_alert,
+    ask_user_question,
+)
+
+# @tool has already built each JSON schema from the signature and docstring
+# at import. Agno deep-copies every Function per run and would re-derive it
+# (inspect.signature, get_type_hints, docstring parsing); marking them as
+# processed reuses the import-time schema, as Agno does for Toolkit methods.
+for _function in _TOOLS:
+    _function.skip_entrypoint_processing = True
+
 # ============================================================================
 # KNOWLEDGE BASE CONFIGURATION
 # ============================================================================
 
-def create_knowledge_base(contents_db=None):
+# Where LanceDB keeps the vector table. Point it at a RAM-backed path (e.g.
+# /dev/shm/lancedb on Linux) to take disk I/O off the search path in dev;
+# the vectors are then lost on reboot while tmp/knowledge.db keeps listing
+# the uploaded documents, so re-upload after a restart.
+LANCEDB_URI = os.getenv("LANCEDB_URI", "tmp/lancedb")
+
+def create_knowledge_base(contents_db=None, in_memory_cache=False, quantize_embeddings=False):
     """Create and return the knowledge base with LanceDB vector store.
+
+    Search results are cached (LRU + TTL, cleared on any content change) so
+    repeated questions skip the embedding call and the vector search.
     
     Args:
         contents_db: Optional database for storing knowledge contents.
                      Should have an explicit ID for the AgentOS knowledge API.
+        in_memory_cache: Rank cache misses against an in-memory copy of the
+                     chunk embeddings instead of querying LanceDB (vector-only,
+                     no keyword half of the hybrid search). Concurrent query
+                     embeddings are then batched into one API call.
+        quantize_embeddings: Hold the in-memory copy as INT8 (a quarter of
+                     the memory, ~2x slower scoring). Only used with
+                     in_memory_cache.
     """
-    knowledge = Knowledge(
+    # Imported here so importing this module (agents, teams, scripts) does
+    # not pay for lancedb + pyarrow + numpy unless a knowledge base is built.
+    from agno.knowledge.embedder.openai import OpenAIEmbedder
+    from agno.vectordb.lancedb import LanceDb, SearchType
+
+    from batching_embedder import BatchingEmbedder
+    from knowledge_cache import WarmCachedKnowledge
+
+    # Only the in-memory path embeds queries off the event loop (via
+    # async_get_embedding), where concurrent searches can be coalesced into one
+    # API call. The hybrid path goes through LanceDb.async_search, which calls
+    # the sync search on the loop thread, so batching would never kick in.
+    if in_memory_cache:
+        embedder = BatchingEmbedder(id="text-embedding-3-small", max_batch=32, max_wait_ms=20)
+    else:
+        embedder = OpenAIEmbedder(id="text-embedding-3-small")
+
+    knowledge = WarmCachedKnowledge(
         vector_db=LanceDb(
-            uri="tmp/lancedb",
+            uri=LANCEDB_URI,
             table_name="demo_knowledge",
             search_type=SearchType.hybrid,
-            embedder=OpenAIEmbedder(id="text-embedding-3-small"),
+            embedder=embedder,
         ),
         contents_db=contents_db,
+        cache_max_size=2000,
+        cache_ttl_seconds=600,
+        in_memory_cache=in_memory_cache,
+        quantize_embeddings=quantize_embeddings,
     )
     return knowledge
 
@@ -340,6 +433,40 @@ def create_knowledge_base(contents_db=None):
 # AGENT CONFIGURATION
 # ============================================================================
 
+_DESCRIPTION = "AI assistant that demonstrates generative UI capabilities with interactive charts, cards, tables, and visualizations."
+
+# Agno renders a list of instructions as "- item" lines. Pre-rendering them
+# once into a single string keeps the same bullets in the system prompt
+# without rebuilding them from a list on every turn.
+_INSTRUCTION_LINES = (
+    "You are a helpful AI assistant that creates beautiful, interactive visualizations.",
+    "",
+    "CRITICAL WORKFLOW:",
+    "1. When user asks for data visualization, FIRST fetch the data using the appropriate get_* tool",
+    "2. THEN pass that data to the appropriate render_* tool for frontend display",
+    "3. When the user asks for several datasets at once, call all the needed get_* tools",
+    "   together in a single turn (they run in parallel), then render each result.",
+    "",
+    "Examples:",
+    "- User: 'Show revenue' -> call get_revenue_data() -> call render_revenue_chart(data=result)",
+    "- User: 'Show rental cars' -> call get_rental_cars() -> call render_rental_cars(data=result)",
+    "- User: 'Compare laptops' -> call get_laptop_comparison() -> call render_product_comparison(data=result)",
+    "- User: 'Show my dashboard' -> call get_dashboard_metrics() -> call render_dashboard(data=result)",
+    "- User: 'Visualize market share' -> call get_market_share_data() -> call render_visualization(data=result, chartType='pie')",
+    "",
+    "The render_* tools execute on the FRONTEND and create interactive UI components.",
+    "Always explain what you're showing and offer to adjust the visualization.",
+    "",
+    "You also have ask_user_question available. Use it whenever you need a specific piece",
+    "of information from the user before you can proceed (e.g. their name, a preference,",
+    "a date range). Ask one focused question at a time.",
+    "",
+    "You also have access to a knowledge base. When users ask about uploaded documents,",
+    "search the knowledge base to find relevant information.",
+)
+_INSTRUCTIONS = sys.intern("\n".join(f"- {line}" for line in _INSTRUCTION_LINES))
+
+
 def create_agent(db, knowledge=None):
     """Create and return the generative UI demo agent.
     
@@ -347,56 +474,33 @@ def create_agent(db, knowledge=None):
         db: Database for sessions and other agent data.
         knowledge: Optional knowledge base to attach to the agent.
     """
+    # Agno's async run loop (used by AgentOS) executes every tool call of a
+    # single model turn concurrently via asyncio.gather, offloading sync
+    # tools to threads. The instructions only need to let the model batch
+    # independent get_* calls into one turn; render_* calls still follow.
     return Agent(
         name="generative-ui-demo",
         db=db,
         knowledge=knowledge,
         search_knowledge=True,
-        tools=[
-            # Backend data fetching tools
-            get_revenue_data,
-            get_rental_cars,
-            get_laptop_comparison,
-            get_dashboard_metrics,
-            get_market_share_data,
-            # Frontend rendering tools
-            render_revenue_chart,
-            render_rental_cars,
-            render_product_comparison,
-            render_dashboard,
-            render_visualization,
-            show_alert,
-            ask_user_question,
-            ReasoningTools(add_instructions=True)
-        ],
-        model=Claude(id="claude-sonnet-4-20250514"),
-        description="AI assistant that demonstrates generative UI capabilities with interactive charts, cards, tables, and visualizations.",
-        instructions=[
-            "You are a helpful AI assistant that creates beautiful, interactive visualizations.",
-            "",
-            "CRITICAL WORKFLOW:",
-            "1. When user asks for data visualization, FIRST fetch the data using the appropriate get_* tool",
-            "2. THEN pass that data to the appropriate render_* tool for frontend display",
-            "",
-            "Examples:",
-            "- User: 'Show revenue' -> call get_revenue_data() -> call render_revenue_chart(data=result)",
-            "- User: 'Show rental cars' -> call get_rental_cars() -> call render_rental_cars(data=result)",
-            "- User: 'Compare laptops' -> call get_laptop_comparison() -> call render_product_comparison(data=result)",
-            "- User: 'Show my dashboard' -> call get_dashboard_metrics() -> call render_dashboard(data=result)",
-            "- User: 'Visualize market share' -> call get_market_share_data() -> call render_visualization(data=result, chartType='pie')",
-            "",
-            "The render_* tools execute on the FRONTEND and create interactive UI components.",
-            "Always explain what you're showing and offer to adjust the visualization.",
-            "",
-            "You also have ask_user_question available. Use it whenever you need a specific piece",
-            "of information from the user before you can proceed (e.g. their name, a preference,",
-            "a date range). Ask one focused question at a time.",
-            "",
-            "You also have access to a knowledge base. When users ask about uploaded documents,",
-            "search the knowledge base to find relevant information.",
-        ],
+        tools=[*_TOOLS, ReasoningTools(add_instructions=True)],
+        # Anthropic caches the prompt prefix (tool schemas + system prompt) up
+        # to the cache_control marker on the system block. Tools, description
+        # and instructions are import-time constants, and nothing per-request
+        # (date, session state, user name) goes into the system prompt, so
+        # every turn after the first reads that prefix from the cache.
+        model=Claude(
+            id="claude-sonnet-4-20250514",
+            cache_system_prompt=True,
+            http_client=get_default_async_client(),
+        ),
+        description=_DESCRIPTION,
+        instructions=_INSTRUCTIONS,
+        add_datetime_to_context=False,
         add_history_to_context=True,
         markdown=True,
-        # debug_mode=True,
-        # debug_level=2,
+        # Verbose per-call logging stays off unless AGENT_DEBUG=1
+        # (AGENT_DEBUG_LEVEL=2 for full detail)
+        debug_mode=os.getenv("AGENT_DEBUG", "0") == "1",
+        debug_level=2 if os.getenv("AGENT_DEBUG_LEVEL") == "2" else 1,
     )
@@ -0,0 +1,177 @@
+"""
+Batching Embedder
+
+An `OpenAIEmbedder` that coalesces concurrent query embeddings into one
+`embeddings.create(input=[...])` call.
+
+Each `get_embedding` / `async_get_embedding` call waits up to `max_wait_ms`
+for other callers before a single request embeds up to `max_batch` texts at
+once. Under concurrent load, k searches cost one round-trip instead of k.
+
+  - Async callers share an `asyncio.Queue` drained by a background task on
+    the running event loop.
+  - Sync callers on worker threads share a `queue.Queue` drained by a daemon
+    thread.
+  - Sync calls made *on* an event loop thread (e.g. LanceDb.async_search,
+    which wraps its sync search) bypass batching: blocking the loop for the
+    window would stop the very requests it is waiting for from arriving.
+
+Document embedding during inserts (`get_embedding_and_usage` and the
+built-in batch methods) is left untouched.
+
+The async client uses Agno's process-wide httpx client (`agno.utils.http`).
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.knowledge.embedder.openai import OpenAIEmbedder
+from agno.utils.http import get_default_async_client
+from agno.utils.log import log_warning
+from openai import AsyncOpenAI
+
+
+@dataclass
+class BatchingEmbedder(OpenAIEmbedder):
+    max_batch: int = 32
+    max_wait_ms: float = 20
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._async_queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._async_queue_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_worker_task: Optional[asyncio.Task] = None
+        self._sync_queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._sync_worker: Optional[threading.Thread] = None
+        self._sync_worker_lock = threading.Lock()
+
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        # `client_params` is shared with the sync client, so the pool is passed here instead.
+        if self.async_client is None:
+            params = {"api_key": self.api_key, "organization": self.organization, "base_url": self.base_url}
+            params = {k: v for k, v in params.items() if v is not None}
+            if self.client_params:
+                params.update(self.client_params)
+            self.async_client = AsyncOpenAI(**params, http_client=get_default_async_client())
+        return self.async_client
+
+    def _batch_request(self, texts: List[str]) -> Dict[str, Any]:
+        # Mirrors OpenAIEmbedder's single-text request parameters.
+        req: Dict[str, Any] = {
+            "input": texts,
+            "model": self.id,
+            "encoding_format": self.encoding_format,
+        }
+        if self.user is not None:
+            req["user"] = self.user
+        if self.id.startswith("text-embedding-3") or self.base_url is not None:
+            req["dimensions"] = self.dimensions
+        if self.request_params:
+            req.update(self.request_params)
+        return req
+
+    # ==========================================
+    # ASYNC
+    # ==========================================
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        if self.max_batch <= 1:
+            return await super().async_get_embedding(text)
+
+        loop = asyncio.get_running_loop()
+        if self._async_queue is None or self._async_queue_loop is not loop:
+            self._async_queue = asyncio.Queue()
+            self._async_queue_loop = loop
+            # Keep a reference; the loop only holds tasks weakly.
+            self._async_worker_task = loop.create_task(self._async_worker(self._async_queue))
+
+        future: asyncio.Future = loop.create_future()
+        await self._async_queue.put((text, future))
+        return await future
+
+    async def _async_worker(self, pending: "asyncio.Queue[Tuple[str, asyncio.Future]]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await pending.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                response = await self.aclient.embeddings.create(**self._batch_request(texts))
+                embeddings = [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+            except Exception as e:
+                log_warning(f"Batched embedding of {len(texts)} texts failed, retrying individually: {str(e)}")
+                embeddings = [await super(BatchingEmbedder, self).async_get_embedding(text) for text in texts]
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    # ==========================================
+    # SYNC
+    # ==========================================
+
+    def get_embedding(self, text: str) -> List[float]:
+        if self.max_batch <= 1 or _on_event_loop_thread():
+            return super().get_embedding(text)
+
+        self._ensure_sync_worker()
+        future: Future = Future()
+        self._sync_queue.put((text, future))
+        return future.result()
+
+    def _ensure_sync_worker(self) -> None:
+        if self._sync_worker is not None:
+            return
+        with self._sync_worker_lock:
+            if self._sync_worker is None:
+                self._sync_worker = threading.Thread(
+                    target=self._sync_worker_loop, name="batching-embedder", daemon=True
+                )
+                self._sync_worker.start()
+
+    def _sync_worker_loop(self) -> None:
+        while True:
+            batch = [self._sync_queue.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._sync_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                response = self.client.embeddings.create(**self._batch_request(texts))
+                embeddings = [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+            except Exception as e:
+                log_warning(f"Batched embedding of {len(texts)} texts failed, retrying individually: {str(e)}")
+                embeddings = [super(BatchingEmbedder, self).get_embedding(text) for text in texts]
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
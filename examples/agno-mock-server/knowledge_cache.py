@@ -0,0 +1,414 @@
+"""
+Cached Knowledge
+
+A drop-in `Knowledge` subclass that memoizes search results, so repeated
+questions skip both the embedding API call and the LanceDB hybrid search.
+
+  - Results are keyed by the normalized query (lowercased, whitespace
+    collapsed) plus the search arguments.
+  - Entries expire after `cache_ttl_seconds`; the least recently used entry
+    is evicted once `cache_max_size` is reached.
+  - Any content insert, update, or removal clears the cache, so an upload
+    through the AgentOS knowledge API is visible on the very next search.
+
+`WarmCachedKnowledge` adds an optional in-memory (float32 or INT8) embedding
+matrix, so cache misses are ranked with NumPy instead of a LanceDB query.
+
+Both subclass `Knowledge` (rather than wrapping it) because AgentOS only
+exposes knowledge bases that pass an `isinstance(..., Knowledge)` check.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.knowledge.document import Document
+from agno.knowledge.knowledge import Knowledge
+from agno.utils.log import log_debug, log_error
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class CachedKnowledge(Knowledge):
+    """Knowledge base with a thread-safe LRU + TTL cache in front of search."""
+
+    cache_max_size: int = 2000
+    cache_ttl_seconds: float = 600
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._search_cache: "OrderedDict[Tuple, Tuple[float, List[Document]]]" = OrderedDict()
+        self._search_cache_lock = threading.RLock()
+        # Bumped on every clear; a search that started before an invalidation
+        # must not store its (possibly stale) results afterwards.
+        self._search_cache_generation = 0
+
+    # ==========================================
+    # CACHE
+    # ==========================================
+
+    def _cache_key(self, query: str, max_results, filters, search_type) -> Tuple:
+        # Filters may be a dict or a list of FilterExpr; repr() gives a stable
+        # hashable form for both.
+        return (_normalize_query(query), max_results or self.max_results, repr(filters), search_type)
+
+    def _cache_get(self, key: Tuple) -> Optional[List[Document]]:
+        with self._search_cache_lock:
+            entry = self._search_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.cache_ttl_seconds:
+                del self._search_cache[key]
+                return None
+            self._search_cache.move_to_end(key)
+            return list(results)
+
+    def _cache_put(self, key: Tuple, results: List[Document], generation: int) -> None:
+        # Knowledge.search returns [] on errors too; never pin those.
+        if not results:
+            return
+        # LanceDb attaches each hit's full embedding (~50 KB as a list of 1536
+        # floats) that no consumer reads; caching it would cost up to
+        # cache_max_size x max_results of those per process.
+        stored = [replace(doc, embedding=None) if doc.embedding is not None else doc for doc in results]
+        with self._search_cache_lock:
+            if generation != self._search_cache_generation:
+                return
+            self._search_cache[key] = (time.monotonic(), stored)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > self.cache_max_size:
+                self._search_cache.popitem(last=False)
+
+    def clear_search_cache(self) -> None:
+        with self._search_cache_lock:
+            self._search_cache.clear()
+            self._search_cache_generation += 1
+
+    # ==========================================
+    # SEARCH
+    # ==========================================
+
+    def search(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        filters: Optional[Any] = None,
+        search_type: Optional[str] = None,
+    ) -> List[Document]:
+        key = self._cache_key(query, max_results, filters, search_type)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        generation = self._search_cache_generation
+        results = self._search_uncached(query, max_results, filters, search_type)
+        self._cache_put(key, results, generation)
+        return results
+
+    async def asearch(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        filters: Optional[Any] = None,
+        search_type: Optional[str] = None,
+    ) -> List[Document]:
+        key = self._cache_key(query, max_results, filters, search_type)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        generation = self._search_cache_generation
+        results = await self._asearch_uncached(query, max_results, filters, search_type)
+        self._cache_put(key, results, generation)
+        return results
+
+    def _search_uncached(self, query, max_results, filters, search_type) -> List[Document]:
+        return super().search(query, max_results=max_results, filters=filters, search_type=search_type)
+
+    async def _asearch_uncached(self, query, max_results, filters, search_type) -> List[Document]:
+        return await super().asearch(query, max_results=max_results, filters=filters, search_type=search_type)
+
+    # ==========================================
+    # INVALIDATION
+    # ==========================================
+
+    # Every insert path (insert, add_content, the AgentOS upload endpoint)
+    # funnels through _load_content / _aload_content.
+
+    def _on_content_changed(self) -> None:
+        self.clear_search_cache()
+
+    def _load_content(self, *args, **kwargs) -> None:
+        try:
+            super()._load_content(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    async def _aload_content(self, *args, **kwargs) -> None:
+        try:
+            await super()._aload_content(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    def patch_content(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        try:
+            return super().patch_content(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    async def apatch_content(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        try:
+            return await super().apatch_content(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    def remove_content_by_id(self, *args, **kwargs):
+        try:
+            return super().remove_content_by_id(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    async def aremove_content_by_id(self, *args, **kwargs):
+        try:
+            return await super().aremove_content_by_id(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    def remove_vector_by_id(self, *args, **kwargs) -> bool:
+        try:
+            return super().remove_vector_by_id(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    def remove_vectors_by_name(self, *args, **kwargs) -> bool:
+        try:
+            return super().remove_vectors_by_name(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+    def remove_vectors_by_metadata(self, *args, **kwargs) -> bool:
+        try:
+            return super().remove_vectors_by_metadata(*args, **kwargs)
+        finally:
+            self._on_content_changed()
+
+
+# Rows dequantized per matmul in the INT8 path; bounds the float32 scratch
+# buffer to ~6 MB for 1536-dim embeddings regardless of table size.
+_SCORE_BLOCK_ROWS = 1024
+
+
+@dataclass(frozen=True)
+class _WarmCache:
+    """Snapshot of the chunk embeddings, swapped atomically on reload."""
+
+    # Unit-normalized embeddings, shape (N, dims): INT8 when quantized,
+    # float32 otherwise.
+    embeddings: np.ndarray
+    # Per-row dequantization scales, shape (N,); None for float32 storage.
+    scales: Optional[np.ndarray]
+    documents: List[Document]
+    # meta_data key -> value -> row positions, for every hashable value.
+    meta_index: Dict[str, Dict[Any, np.ndarray]]
+
+    def score(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every chunk against a unit-normalized query."""
+        if self.scales is None:
+            return self.embeddings @ query
+
+        # NumPy's integer matmul doesn't go through BLAS, so dequantize one
+        # block at a time and keep the float32 GEMV. The query stays float32;
+        # only the stored rows carry quantization error.
+        scores = np.empty(len(self.embeddings), dtype=np.float32)
+        for start in range(0, len(self.embeddings), _SCORE_BLOCK_ROWS):
+            block = self.embeddings[start : start + _SCORE_BLOCK_ROWS]
+            np.matmul(block.astype(np.float32), query, out=scores[start : start + len(block)])
+        scores *= self.scales
+        return scores
+
+    def filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Rows whose meta_data equals every filter value (LanceDb.search semantics)."""
+        mask = np.ones(len(self.documents), dtype=bool)
+        for key, value in filters.items():
+            try:
+                rows = self.meta_index.get(key, {}).get(value)
+            except TypeError:
+                # Unhashable filter values (lists, dicts) are not indexed.
+                key_mask = np.fromiter(
+                    (key in (doc.meta_data or {}) and doc.meta_data[key] == value for doc in self.documents),
+                    dtype=bool,
+                    count=len(self.documents),
+                )
+            else:
+                key_mask = np.zeros(len(self.documents), dtype=bool)
+                if rows is not None:
+                    key_mask[rows] = True
+            mask &= key_mask
+        return mask
+
+
+def _index_meta_data(documents: List[Document]) -> Dict[str, Dict[Any, np.ndarray]]:
+    rows: Dict[str, Dict[Any, List[int]]] = {}
+    for i, doc in enumerate(documents):
+        for key, value in (doc.meta_data or {}).items():
+            try:
+                rows.setdefault(key, {}).setdefault(value, []).append(i)
+            except TypeError:
+                # An unhashable value never equals a hashable filter value.
+                continue
+    return {
+        key: {value: np.array(positions, dtype=np.intp) for value, positions in by_value.items()}
+        for key, by_value in rows.items()
+    }
+
+
+def _quantize_rows(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row INT8 quantization: row ~= row_q * scale."""
+    scales = np.abs(embeddings).max(axis=1) / 127
+    scales[scales == 0] = 1
+    quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+@dataclass
+class WarmCachedKnowledge(CachedKnowledge):
+    """CachedKnowledge that can also rank cache misses entirely in memory.
+
+    With `in_memory_cache=True`, the first search loads every chunk embedding
+    from LanceDB into one NumPy matrix. Later misses embed the query once and
+    score all chunks with a single matrix-vector product, with no LanceDB
+    I/O on the query path. The matrix is dropped on any content change and
+    reloaded lazily.
+
+    Embeddings are kept as float32 by default. `quantize_embeddings=True`
+    stores them as INT8 with a per-row scale, a quarter of the footprint, for
+    when the matrix would not otherwise fit in memory. It trades speed for
+    that: each query dequantizes every block back to float32, so scoring is
+    about 2x slower (20k x 1536 chunks: ~5 ms float32 vs ~11 ms INT8), and
+    recall drops slightly.
+
+    In-memory ranking is pure cosine similarity, so it replaces the keyword
+    half of LanceDB's hybrid search. List-style filter expressions (which
+    LanceDB ignores anyway) fall back to the regular search path.
+    """
+
+    in_memory_cache: bool = True
+    quantize_embeddings: bool = False
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._warm_cache: Optional[_WarmCache] = None
+        self._warm_cache_lock = threading.Lock()
+
+    def ensure_cache_warm(self) -> _WarmCache:
+        warm_cache = self._warm_cache
+        if warm_cache is not None:
+            return warm_cache
+        with self._warm_cache_lock:
+            if self._warm_cache is None:
+                self._warm_cache = self._load_warm_cache()
+            return self._warm_cache
+
+    def _load_warm_cache(self) -> _WarmCache:
+        vector_db = self.vector_db
+        if vector_db.table is None or vector_db.get_count() == 0:
+            return _WarmCache(np.empty((0, 0), dtype=np.float32), None, [], {})
+
+        table = vector_db.table.to_arrow()
+        documents = []
+        for raw in table.column("payload").to_pylist():
+            payload = json.loads(raw)
+            documents.append(
+                Document(
+                    name=payload["name"],
+                    meta_data=payload["meta_data"],
+                    content=payload["content"],
+                    embedder=vector_db.embedder,
+                    usage=payload["usage"],
+                    content_id=payload.get("content_id"),
+                )
+            )
+
+        vectors = table.column(vector_db._vector_col).combine_chunks()
+        embeddings = np.array(vectors.flatten(), dtype=np.float32).reshape(len(documents), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+
+        scales = None
+        if self.quantize_embeddings:
+            embeddings, scales = _quantize_rows(embeddings)
+        log_debug(f"Warmed in-memory embedding cache with {len(documents)} chunks ({embeddings.dtype})")
+        return _WarmCache(embeddings, scales, documents, _index_meta_data(documents))
+
+    def _rank(
+        self, warm_cache: _WarmCache, query_embedding, limit: int, filters: Optional[Dict[str, Any]]
+    ) -> List[Document]:
+        documents = warm_cache.documents
+        if not documents:
+            return []
+
+        q = np.asarray(query_embedding, dtype=np.float32)
+        scores = warm_cache.score(q / (np.linalg.norm(q) or 1))
+
+        if filters:
+            mask = warm_cache.filter_mask(filters)
+            scores[~mask] = -np.inf
+            limit = min(limit, int(mask.sum()))
+
+        k = min(limit, len(documents))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [documents[i] for i in top]
+
+    def _search_filters(self, filters):
+        if self.isolate_vector_search and self.name:
+            return {**(filters or {}), "linked_to": self.name}
+        return filters
+
+    def _use_in_memory(self, filters) -> bool:
+        return self.in_memory_cache and self.vector_db is not None and not isinstance(filters, list)
+
+    def _search_uncached(self, query, max_results, filters, search_type) -> List[Document]:
+        if not self._use_in_memory(filters):
+            return super()._search_uncached(query, max_results, filters, search_type)
+        try:
+            warm_cache = self.ensure_cache_warm()
+            query_embedding = self.vector_db.embedder.get_embedding(query)
+            return self._rank(
+                warm_cache, query_embedding, max_results or self.max_results, self._search_filters(filters)
+            )
+        except Exception as e:
+            log_error(f"Error searching in-memory embedding cache: {str(e)}")
+            return []
+
+    async def _asearch_uncached(self, query, max_results, filters, search_type) -> List[Document]:
+        if not self._use_in_memory(filters):
+            return await super()._asearch_uncached(query, max_results, filters, search_type)
+        try:
+            # A cold load reads the whole table (to_arrow, one json.loads per
+            # row); keep it off the event loop so in-flight requests and
+            # streams are not stalled behind it.
+            warm_cache = self._warm_cache
+            if warm_cache is None:
+                warm_cache = await asyncio.to_thread(self.ensure_cache_warm)
+            query_embedding = await self.vector_db.embedder.async_get_embedding(query)
+            return self._rank(
+                warm_cache, query_embedding, max_results or self.max_results, self._search_filters(filters)
+            )
+        except Exception as e:
+            log_error(f"Error searching in-memory embedding cache: {str(e)}")
+            return []
+
+    def _on_content_changed(self) -> None:
+        with self._warm_cache_lock:
+            self._warm_cache = None
+        super()._on_content_changed()
@@ -4,40 +4,158 @@ Agno Mock Server
 Serves both an agent and a team for testing the agno-client library.
 
 Usage:
-    python examples/agno-mock-server/server.py
+    python examples/agno-mock-server/server.py          # dev: auto-reload
+    python examples/agno-mock-server/server.py --prod   # no reload, WORKERS processes
 
 Then connect the frontend to http://localhost:7777
 """
 
+import os
+
+from dotenv import load_dotenv
+
+# Load .env before anything else: the thread caps below and agent.py's
+# settings (e.g. LANCEDB_URI) are read at import time.
+load_dotenv()
+
+
+def _workers_from_env() -> int:
+    """Number of --prod worker processes, from WORKERS (default 1)."""
+    raw = os.getenv("WORKERS", "1")
+    try:
+        workers = int(raw)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise SystemExit(f"WORKERS must be a positive integer, got {raw!r}")
+    return workers
+
+
+WORKERS = _workers_from_env()
+
+# Cap native thread pools before numpy/lancedb are imported. Each of the
+# WORKERS processes would otherwise size OpenMP/BLAS and Lance's CPU pool to
+# every core, oversubscribing the machine under load. Variables already set
+# in the environment (or .env) win.
+_THREADS_PER_WORKER = str(max(1, (os.cpu_count() or 1) // WORKERS))
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "LANCE_CPU_THREADS"):
+    os.environ.setdefault(_var, _THREADS_PER_WORKER)
+# Lance I/O threads mostly wait on the disk; a small fixed pool is enough.
+os.environ.setdefault("LANCE_IO_THREADS", "8")
+
+import httpx
+import orjson
 from agno.db.sqlite import SqliteDb
 from agno.os import AgentOS
-from dotenv import load_dotenv
+from agno.utils.http import set_default_async_client
+from agno.utils.log import log_info
+from fastapi import FastAPI
+from sqlalchemy import event
+from starlette.responses import JSONResponse
 
-from agent import create_agent, create_knowledge_base
+from agent import LANCEDB_URI, create_agent, create_knowledge_base
 from team import create_team
 from state_counter import create_state_counter_agent, create_state_counter_team
 from agno.tracing import setup_tracing
 
-load_dotenv()
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib json module."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Applied to every new SQLite connection. WAL lets session/knowledge reads
+# proceed while a write is in flight, and synchronous=NORMAL only fsyncs at
+# checkpoints instead of on every commit (safe in WAL mode).
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-64000",  # 64 MB
+    "PRAGMA wal_autocheckpoint=1000",
+)
+
+
+def tune_sqlite(db: SqliteDb) -> SqliteDb:
+    """Register SQLITE_PRAGMAS on the SqliteDb's SQLAlchemy engine."""
+
+    @event.listens_for(db.db_engine, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    # Drop any connection opened before the listener existed
+    db.db_engine.dispose()
+    return db
+
+
+# Short turns ("show me revenue", "compare laptops") are mostly get_*/render_*
+# tool calls; anything else tends to be a longer free-form answer. Both model
+# backends are hosted APIs with no batching control, so every run is still
+# dispatched on its own; the bin is only logged for offline throughput
+# analysis (LOG_REQUEST_BINS=1).
+SHORT_TURN_PREFIXES = ("show", "compare")
+
+
+def request_bin(message: str) -> str:
+    """Expected completion-length bin of a user turn: "short" or "long"."""
+    return "short" if message.lstrip().lower().startswith(SHORT_TURN_PREFIXES) else "long"
+
+
+def log_request_bin(run_input, agent) -> None:
+    """Agno pre-hook that logs the bin of every run."""
+    log_info(f"request bin={request_bin(run_input.input_content_string())} agent={agent.name}")
+
+
+# One async connection pool for every model and the embedder; create_agent,
+# create_team, etc. pass it as http_client=get_default_async_client(), so it
+# must be set before they run. HTTP/2 stays off (Agno's default client turns
+# it on): Agno's OpenAI and Anthropic models avoid it on shared connections
+# (transient 400s from OpenAI, stream saturation on Anthropic).
+set_default_async_client(
+    httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200, keepalive_expiry=60),
+        # Same as the OpenAI/Anthropic SDK defaults; requests override it per call.
+        timeout=httpx.Timeout(600, connect=5),
+        http2=False,
+        follow_redirects=True,
+    )
+)
 
 # Shared database for sessions and other data
-db = SqliteDb(db_file="tmp/data.db")
+db = tune_sqlite(SqliteDb(db_file="tmp/data.db"))
 
 # Enable tracing (call once at startup)
 setup_tracing(db=db)
 
 # Create a separate database for knowledge content with an explicit ID
 # This ID is used by the frontend to access the knowledge API
-knowledge_db = SqliteDb(
+knowledge_db = tune_sqlite(SqliteDb(
     db_file="tmp/knowledge.db",
     id="demo-knowledge-db",  # Explicit ID for the AgentOS knowledge API
-)
+))
 
-# Create the knowledge base with the dedicated database
-knowledge = create_knowledge_base(contents_db=knowledge_db)
+# Create the knowledge base with the dedicated database.
+# KNOWLEDGE_IN_MEMORY_CACHE=1 ranks searches against an in-memory copy of the
+# embeddings instead of querying LanceDB (vector-only ranking);
+# KNOWLEDGE_QUANTIZE_EMBEDDINGS=1 holds that copy as INT8.
+knowledge = create_knowledge_base(
+    contents_db=knowledge_db,
+    in_memory_cache=os.getenv("KNOWLEDGE_IN_MEMORY_CACHE") == "1",
+    quantize_embeddings=os.getenv("KNOWLEDGE_QUANTIZE_EMBEDDINGS") == "1",
+)
 
 # Create the agent with the knowledge base
 agent = create_agent(db, knowledge=knowledge)
+if os.getenv("LOG_REQUEST_BINS") == "1":
+    agent.pre_hooks = [*(agent.pre_hooks or []), log_request_bin]
 
 # Create the team
 team = create_team(db)
@@ -47,10 +165,19 @@ team = create_team(db)
 state_counter_agent = create_state_counter_agent(db)
 state_counter_team = create_state_counter_team(db)
 
+# AgentOS mounts its routers onto this app, so every JSON endpoint inherits
+# the orjson response class (streamed run events are unaffected).
+base_app = FastAPI(
+    title="agno-demo",
+    description="Demo server with agent and team examples",
+    default_response_class=ORJSONResponse,
+)
+
 # Create AgentOS with agent, team, knowledge, and tracing
 agent_os = AgentOS(
     id="agno-demo",
     description="Demo server with agent and team examples",
+    base_app=base_app,
     agents=[agent, state_counter_agent],
     teams=[team, state_counter_team],
     db=db,
@@ -65,16 +192,46 @@ app = agent_os.get_app()
 # --- Fake transcription endpoint for testing audio transcription mode ---
 import asyncio
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response, StreamingResponse
+
+# Simulated latency; set FAKE_TRANSCRIBE_DELAY_MS=0 for load tests so
+# requests aren't bound by the timer.
+FAKE_TRANSCRIBE_DELAY_MS = int(os.getenv("FAKE_TRANSCRIBE_DELAY_MS", "1500"))
+FAKE_TRANSCRIPTION = "This is a fake transcription. Implement the backend to transcribe."
+_TRANSCRIBE_RESPONSE = orjson.dumps({"transcription": FAKE_TRANSCRIPTION})
 
 async def transcribe(request: Request):
     """Fake transcription endpoint that returns a fixed string after a simulated delay."""
-    await asyncio.sleep(1.5)  # Simulate API latency
-    return JSONResponse({"transcription": "This is a fake transcription. Implement the backend to transcribe."})
+    if FAKE_TRANSCRIBE_DELAY_MS > 0:
+        await asyncio.sleep(FAKE_TRANSCRIBE_DELAY_MS / 1000)  # Simulate API latency
+    return Response(_TRANSCRIBE_RESPONSE, media_type="application/json")
+
+async def transcribe_stream(request: Request):
+    """Streaming variant: emits the fixed transcription word by word every 50 ms.
+
+    Models time-to-first-token separately from total latency. The audio
+    recorder in agno-react expects the JSON endpoint above; this one is for
+    benchmarking only.
+    """
+    async def words():
+        for word in FAKE_TRANSCRIPTION.split(" "):
+            await asyncio.sleep(0.05)
+            yield word + " "
+
+    return StreamingResponse(words(), media_type="text/plain")
 
 app.add_route("/transcribe", transcribe, methods=["POST"])
+app.add_route("/transcribe/stream", transcribe_stream, methods=["POST"])
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agno demo server")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--dev", action="store_true", help="auto-reload on source changes (default)")
+    mode.add_argument("--prod", action="store_true", help="no reloader, WORKERS processes, no access log")
+    args = parser.parse_args()
+
     print("\n" + "="*70)
     print("Agno Demo Server")
     print("="*70)
@@ -103,7 +260,21 @@ if __name__ == "__main__":
     print("\nKnowledge base:")
     print("  Upload documents via the Knowledge page in the demo app")
     print("  Knowledge DB ID: demo-knowledge-db")
-    print("  Vector storage: tmp/lancedb")
+    print(f"  Vector storage: {LANCEDB_URI}")
     print("\n" + "="*70 + "\n")
 
-    agent_os.serve(app="server:app", reload=True)
+    if args.prod:
+        # Every worker is a separate process with its own LanceDB handle,
+        # SQLite connections and scheduler, so WORKERS>1 is only safe while
+        # the knowledge base is read-only (and duplicates scheduled runs).
+        # loop/http "auto" pick uvloop and httptools when installed.
+        agent_os.serve(
+            app="server:app",
+            host="0.0.0.0",
+            workers=WORKERS,
+            loop="auto",
+            http="auto",
+            access_log=False,
+        )
+    else:
+        agent_os.serve(app="server:app", reload=True)
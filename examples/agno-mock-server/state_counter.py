@@ -21,6 +21,7 @@ from agno.models.openai import OpenAIChat
 from agno.run.agent import CustomEvent
 from agno.team import Team
 from agno.tools import tool
+from agno.utils.http import get_default_async_client
 
 
 @dataclass
@@ -72,7 +73,7 @@ def create_state_counter_agent(db) -> Agent:
         name="state-counter-agent",
         id="state-counter-agent",
         db=db,
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="Demo agent that mutates session_state via tools and yields a SessionStateUpdatedEvent so clients can live-sync.",
         instructions=[
             "You are a counter agent.",
@@ -94,7 +95,7 @@ def create_state_counter_team(db) -> Team:
         name="counter-worker",
         id="counter-worker",
         db=db,
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="Counter specialist that mutates the team's session_state.",
         instructions=[
             "You handle counter operations for the team.",
@@ -109,7 +110,7 @@ def create_state_counter_team(db) -> Team:
         id="state-counter-team",
         db=db,
         members=[counter_agent],
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="Demo team that mutates session_state via member tools.",
         instructions=[
             "Coordinate with counter-worker for any counter-related request.",
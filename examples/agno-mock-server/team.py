@@ -8,6 +8,7 @@ that can collaborate to answer questions.
 from agno.agent import Agent
 from agno.team import Team
 from agno.models.openai import OpenAIChat
+from agno.utils.http import get_default_async_client
 
 
 def create_team(db):
@@ -17,7 +18,7 @@ def create_team(db):
     researcher = Agent(
         name="researcher",
         db=db,
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="Research specialist who gathers and analyzes information.",
         instructions=[
             "You are a research specialist.",
@@ -32,7 +33,7 @@ def create_team(db):
     writer = Agent(
         name="writer",
         db=db,
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="Writing specialist who creates clear, engaging content.",
         instructions=[
             "You are a writing specialist.",
@@ -48,7 +49,7 @@ def create_team(db):
         name="simple-team",
         db=db,
         members=[researcher, writer],
-        model=OpenAIChat(id="gpt-4o-mini"),
+        model=OpenAIChat(id="gpt-4o-mini", http_client=get_default_async_client()),
         description="A simple team with a researcher and a writer that collaborate to answer questions.",
         instructions=[
             "You are a team leader coordinating between a researcher and a writer.",
@@ -64,15 +65,19 @@ def create_team(db):
         # debug_level=2,
     )
 
+    # Agno's default model (gpt-4o), made explicit so it shares the
+    # connection pool; members without a model inherit their team's.
     team = Team(
         name="language-team",
         db=db,
+        model=OpenAIChat(id="gpt-4o", http_client=get_default_async_client()),
         members=[
             Agent(name="English Agent", role="You answer questions in English"),
             Agent(name="Chinese Agent", role="You answer questions in Chinese"),
             Team(
                 name="Germanic Team",
                 role="You coordinate the team members to answer questions in German and Dutch",
+                model=OpenAIChat(id="gpt-4o", http_client=get_default_async_client()),
                 members=[
                     Agent(name="German Agent", role="You answer questions in German"),
                     Agent(name="Dutch Agent", role="You answer questions in Dutch"),